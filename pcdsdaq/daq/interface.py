@@ -37,13 +37,21 @@ logger = logging.getLogger(__name__)
 
 # Not-None sentinal for default value when None has a special meaning
 # Indicates that the last configured value should be used
+# Sentinels are singletons, even through copy and pickle: compare with
+# "is", e.g. "value is CONFIG_VAL"
 class Sentinel:
+    __slots__ = ('id',)
+
     def __init__(self, id):
         self.id = id
 
     def __str__(self):
         return self.id
 
+    def __reduce__(self):
+        # Copies and unpickles resolve to the module-level instance
+        return self.id
+
 
 CONFIG_VAL = Sentinel('CONFIG_VAL')
 
@@ -467,12 +475,13 @@ class DaqBase(BaseInterface, Device):
         end_run : ``bool``, optional
             If True, end the daq after we're done running.
         """
-        logger.debug(
-            'DaqBase.begin(wait=%s, end_run=%s, kwargs=%s)',
-            wait,
-            end_run,
-            kwargs,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'DaqBase.begin(wait=%s, end_run=%s, kwargs=%s)',
+                wait,
+                end_run,
+                kwargs,
+            )
         try:
             kickoff_status = self.kickoff(**kwargs)
             try:
@@ -645,13 +654,14 @@ class DaqBase(BaseInterface, Device):
         show_queued_cfg : bool, optional
             If True, gives a nice printout of the new configuration.
         """
-        logger.debug(
-            "DaqBase.preconfig(show_queued_cfg=%s, kwargs=%s)",
-            show_queued_cfg,
-            kwargs,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqBase.preconfig(show_queued_cfg=%s, kwargs=%s)",
+                show_queued_cfg,
+                kwargs,
+            )
         for key, value in kwargs.items():
-            if isinstance(value, Sentinel):
+            if value is CONFIG_VAL:
                 continue
             try:
                 sig = getattr(self, key + '_cfg')
@@ -697,7 +707,8 @@ class DaqBase(BaseInterface, Device):
             The previous configuration and the new configuration after calling
             this method. This is a requirement of the bluesky interface.
         """
-        logger.debug("DaqBase.configure(kwargs=%s)", kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DaqBase.configure(kwargs=%s)", kwargs)
         old = self.read_configuration()
         self.preconfig(show_queued_cfg=False, **kwargs)
         return old, self.read_configuration()
@@ -43,12 +43,14 @@ https://confluence.slac.stanford.edu/display/PSDMInternal/Finite+State+Machine
 from __future__ import annotations
 
 import logging
+import queue
 import threading
-import time
-from collections.abc import Iterator
+from collections import deque
+from collections.abc import Iterator, Mapping
 from functools import cache
 from numbers import Real
-from typing import Any, Union, get_type_hints
+from types import MappingProxyType
+from typing import Any, Union, get_args, get_origin, get_type_hints
 
 from bluesky import RunEngine
 from ophyd.device import Component as Cpt
@@ -60,8 +62,7 @@ from pcdsutils.enum import HelpfulIntEnum
 
 from ..exceptions import DaqStateTransitionError, DaqTimeoutError
 from .interface import (CONFIG_VAL, ControlsArg, DaqBase, EnumId, Sentinel,
-                        TernaryBool, get_controls_name, get_controls_value,
-                        typing_check)
+                        TernaryBool, get_controls_name, get_controls_value)
 
 try:
     from psdaq.control.ControlDef import ControlDef
@@ -71,6 +72,36 @@ except ImportError:
     DaqControl = None
 
 logger = logging.getLogger(__name__)
+# Below DEBUG, for the logs on the per-step bluesky control path
+TRACE = 5
+
+
+def _hint_classes(hint: Any) -> tuple[type, ...]:
+    """
+    The classes that a value must be an instance of to match the hint.
+
+    This mirrors typing_check: unions are split into their members and
+    subscripted generics such as list[int] are reduced to their origin.
+    """
+    if get_origin(hint) is Union:
+        members = get_args(hint)
+    else:
+        members = (hint,)
+    return tuple(get_origin(member) or member for member in members)
+
+
+@cache
+def _config_checks(fn) -> dict[str, tuple[Any, tuple[type, ...]]]:
+    """
+    The type hint and the classes to check against for each argument of fn.
+
+    This is evaluated once per function, so that checking a config value
+    is a single isinstance call rather than a walk through the hint.
+    """
+    return {
+        name: (hint, _hint_classes(hint))
+        for name, hint in get_type_hints(fn).items()
+    }
 
 
 class DaqLCLS2(DaqBase):
@@ -236,6 +267,26 @@ class DaqLCLS2(DaqBase):
         'alg_name',
         'alg_version',
     }
+    # Most monitor messages to handle at once during a burst
+    _monitor_batch_max = 64
+    # Most BeginStep data blocks to keep per configuration
+    _block_cache_max = 64
+    # The config arguments of begin, preconfig, and configure, in order
+    _config_arg_names = (
+        'events',
+        'duration',
+        'record',
+        'controls',
+        'motors',
+        'begin_timeout',
+        'begin_sleep',
+        'group_mask',
+        'detname',
+        'scantype',
+        'serial_number',
+        'alg_name',
+        'alg_version',
+    )
 
     def __init__(
         self,
@@ -257,7 +308,62 @@ class DaqLCLS2(DaqBase):
             hutch_name,
             sim,
         )
+        # Callbacks registered by _get_status_for, replaced on each change
+        self._watcher_lock = threading.Lock()
+        self._state_watchers = ()
+        self._transition_watchers = ()
         super().__init__(RE=RE, hutch_name=hutch_name, platform=platform)
+        # Plain dict lookups for the monitor thread's hot path. Keys are
+        # lowercase, look up name.lower() to match the enums' case-insensitive
+        # name lookups.
+        self._state_by_name = {
+            state.name.lower(): state for state in self.state_enum
+        }
+        self._transition_by_name = {
+            transition.name.lower(): transition
+            for transition in self.transition_enum
+        }
+        # States compared against when deciding which transitions to make
+        self._starting_state = self.state_enum.starting
+        self._connected_state = self.state_enum.connected
+        self._configured_state = self.state_enum.configured
+        self._paused_state = self.state_enum.paused
+        self._running_state = self.state_enum.running
+        self._is_configured_by_state = {
+            state: state >= self._configured_state
+            for state in self.state_enum
+        }
+        self._is_configured_by_state[None] = False
+        # Members compared against in monitor thread callbacks
+        self._configure_transition = self.transition_enum.configure
+        # Signals updated from each status message, in message order
+        self._status_info_sigs = (
+            self.config_alias_sig,
+            self.recording_sig,
+            self.bypass_activedet_sig,
+            self.experiment_name_sig,
+            self.run_number_sig,
+            self.last_run_number_sig,
+            self.transition_elapsed_sig,
+            self.transition_total_sig,
+        )
+        # Put every field on the first status, even if unchanged
+        self._status_info_primed = False
+        # BeginStep data blocks from the DAQ, by their inputs. The step
+        # number is one of them, so these are reused across runs of the
+        # same scan in one configuration, not between steps of a run.
+        self._block_cache = {}
+        # Transitions that mean we aren't headed toward running
+        self._not_running_transitions = frozenset(
+            self.transition_enum.exclude(['beginrun', 'beginstep', 'enable'])
+        )
+        self._update_step_doc_template()
+        # Config values read on every trigger, kept current by subscription
+        self._cfg_cache = {}
+        for sig in (self.events_cfg, self.duration_cfg, self.begin_timeout_cfg):
+            self._cfg_cache[sig.attr_name] = sig.get()
+            sig.subscribe(self._update_cfg_cache, run=False)
+        self._recording_cache = self.recording_sig.get()
         self.state_sig.put(self.state_enum.reset)
         self.transition_sig.put(self.transition_enum.reset)
         self.group_mask_cfg.put(1 << platform)
@@ -271,7 +377,18 @@ class DaqLCLS2(DaqBase):
             platform=platform,
             timeout=timeout,
         )
+        self._tune_monitor_socket(host=host, platform=platform)
+        # Handlers for each message header, normal status is the default
+        self._monitor_dispatch = {
+            'error': self._handle_error,
+            'warning': self._handle_warning,
+            'fileReport': self._handle_file_report,
+            'progress': self._handle_progress,
+            'step': self._handle_step,
+        }
+        self._transition_queue = queue.Queue()
         self._start_monitor_thread()
+        self._start_worker_threads()
 
     @property
     @cache
@@ -312,6 +429,43 @@ class DaqLCLS2(DaqBase):
         """
         return HelpfulIntEnum('PsdaqTransition', ControlDef.transitions)
 
+    def _tune_monitor_socket(self, host: str, platform: int) -> None:
+        """
+        Keep the DAQ's ZMQ SUB socket from dropping status messages.
+
+        By default ZMQ sockets stop queueing incoming messages after 1000,
+        which can be reached during DAQ bursts such as the start of a run.
+        Dropped status messages can leave our signals stuck in the wrong
+        state. Here we remove the limit and ask for a larger kernel buffer.
+
+        We intentionally do not set ZMQ_CONFLATE: that would keep only the
+        latest message, but we need to see every state and transition.
+
+        These options only apply to new connections, so we reconnect to
+        the DAQ's publishers afterwards. This is skipped for controls
+        objects that don't have a ``front_sub`` socket, such as the sim.
+
+        Parameters
+        ----------
+        host : str
+            The hostname of the DAQ host we are connecting to.
+        platform : int
+            The daq platform we're connecting to.
+        """
+        socket = getattr(self._control, 'front_sub', None)
+        if socket is None:
+            return
+        try:
+            from psdaq.control.ControlDef import front_pub_port, step_pub_port
+            socket.rcvhwm = 0
+            socket.rcvbuf = 64 * 1024 * 1024
+            for port in (front_pub_port(platform), step_pub_port(platform)):
+                endpoint = f'tcp://{host}:{port}'
+                socket.disconnect(endpoint)
+                socket.connect(endpoint)
+        except Exception as exc:
+            logger.debug("Could not tune the monitor socket: %s", exc)
+
     def _start_monitor_thread(self) -> None:
         """
         Monitor the DAQ state in a background thread.
@@ -320,6 +474,40 @@ class DaqLCLS2(DaqBase):
         thread.daemon = True
         thread.start()
 
+    def _start_worker_threads(self) -> None:
+        """
+        Start the long-lived background thread that runs queued jobs.
+
+        This thread sends the state transitions to the DAQ in the order they
+        were requested.
+        """
+        thread = threading.Thread(target=self._transition_worker, args=())
+        thread.daemon = True
+        thread.start()
+
+    def _transition_worker(self) -> None:
+        """
+        Pass each queued transition request to _transition_thread.
+
+        Runs until destroy queues a None to stop it.
+        """
+        while True:
+            job = self._transition_queue.get()
+            if job is None:
+                return
+            state, phase1_info, status = job
+            try:
+                self._transition_thread(state, phase1_info, status)
+            except Exception as exc:
+                logger.debug("Exception in transition worker: %s", exc)
+
+    def destroy(self) -> None:
+        """
+        Clean up the device and stop the transition worker thread.
+        """
+        super().destroy()
+        self._transition_queue.put(None)
+
     def _monitor_thread(self) -> None:
         """
         Monitors the DAQ's ZMQ subscription messages, puts into our signals.
@@ -334,65 +522,140 @@ class DaqLCLS2(DaqBase):
         useful quantities.
         """
         logger.debug("DaqLCLS2._monitor_thread()")
+        # Bind these once, they are used for every message
+        get_handler = self._monitor_dispatch.get
+        default_handler = self._handle_status
+        drain = self._drain_monitor
         first_loop = True
         while not self._destroyed:
             try:
                 if first_loop:
-                    command, *args = self._control.getStatus()
+                    info = self._control.getStatus()
                     # Remove the platform dictionary in middle of tuple
-                    args = args[:3] + args[4:]
+                    batch = [info[:4] + info[5:]]
                     first_loop = False
                 else:
-                    command, *args = self._control.monitorStatus()
-                logger.debug(
-                    "Received command %s with args %s from monitor.",
-                    command,
-                    args,
-                )
-                if command == 'error':
-                    self.last_err_sig.put(args[0])
-                elif command == 'warning':
-                    self.last_warning_sig.put(args[0])
-                elif command == 'fileReport':
-                    self.last_file_report_sig.put(args[0])
-                elif command == 'progress':
-                    transition, elapsed, total, *_ = args
-                    self.transition_sig.put(
-                        self.transition_enum[transition]
-                    )
-                    self.transition_elapsed_sig.put(elapsed)
-                    self.transition_total_sig.put(total)
-                elif command == 'step':
-                    self.step_value_sig.put(self.step_value_sig.get() + 1)
-                    self.step_done_sig.put(bool(args[0]))
-                else:
-                    # Last case is normal status
-                    transition = command
-                    (state, config_alias, recording, bypass_activedet,
-                     experiment_name, run_number, last_run_number) = args
-                    if transition == 'endrun':
-                        self.step_value_sig.put(1)
-                    if transition == 'endstep':
-                        self.step_done_sig.put(False)
-                    trans_enum = self.transition_enum[transition]
-                    self.transition_sig.put(trans_enum)
-                    if trans_enum == self.transition_enum.configure:
-                        self.configures_seen_sig.put(
-                            self.configures_seen_sig.get() + 1
-                        )
-                    self.state_sig.put(
-                        self.state_enum[state]
-                    )
-                    self.config_alias_sig.put(config_alias)
-                    self.recording_sig.put(recording)
-                    self.bypass_activedet_sig.put(bypass_activedet)
-                    self.experiment_name_sig.put(experiment_name)
-                    self.run_number_sig.put(run_number)
-                    self.last_run_number_sig.put(last_run_number)
-                    self.transition_elapsed_sig.put(0)
-                    self.transition_total_sig.put(0)
+                    batch = drain()
             except Exception as exc:
                 logger.debug("Exception in monitor thread: %s", exc)
+                continue
+            debug = logger.isEnabledFor(logging.DEBUG)
+            last_index = len(batch) - 1
+            for index, info in enumerate(batch):
+                if (
+                    index < last_index
+                    and info[0] == 'progress'
+                    and batch[index + 1][0] == 'progress'
+                ):
+                    # Superseded by the next progress update in the batch
+                    continue
+                try:
+                    if debug:
+                        logger.debug("Received %s from monitor.", info)
+                    get_handler(info[0], default_handler)(info)
+                except Exception as exc:
+                    logger.debug("Exception in monitor thread: %s", exc)
+
+    def _drain_monitor(self) -> list[tuple[Any, ...]]:
+        """
+        Wait for the next monitor message, then grab any that are queued.
+
+        The first monitorStatus call blocks. After that, we keep reading
+        for as long as the DAQ's ZMQ SUB socket reports pending messages,
+        up to _monitor_batch_max messages, so that bursts can be handled
+        together.
+
+        While draining, the socket's receive timeout is set to zero. A
+        pending frame does not guarantee a full message: monitorStatus
+        skips unknown headers and reads again, and that read must fail
+        rather than hold the messages we already have. Any error while
+        draining ends the batch early instead of discarding it.
+
+        Returns
+        -------
+        batch : list[tuple[Any, ...]]
+            The messages in the order they were received.
+        """
+        batch = [self._control.monitorStatus()]
+        socket = getattr(self._control, 'front_sub', None)
+        if socket is None:
+            return batch
+        rcvtimeo = socket.rcvtimeo
+        socket.rcvtimeo = 0
+        try:
+            while (
+                len(batch) < self._monitor_batch_max
+                and socket.poll(timeout=0)
+            ):
+                batch.append(self._control.monitorStatus())
+        except Exception as exc:
+            logger.debug("Stopped draining monitor messages: %s", exc)
+        finally:
+            socket.rcvtimeo = rcvtimeo
+        return batch
+
+    def _handle_error(self, info: tuple[Any, ...]) -> None:
+        """Monitor handler for DAQ error messages."""
+        self.last_err_sig.put(info[1])
+
+    def _handle_warning(self, info: tuple[Any, ...]) -> None:
+        """Monitor handler for DAQ warning messages."""
+        self.last_warning_sig.put(info[1])
+
+    def _handle_file_report(self, info: tuple[Any, ...]) -> None:
+        """Monitor handler for DAQ file report messages."""
+        self.last_file_report_sig.put(info[1])
+
+    def _handle_progress(self, info: tuple[Any, ...]) -> None:
+        """Monitor handler for transition progress messages."""
+        _, transition, elapsed, total, *_ = info
+        self.transition_sig.put(self._transition_by_name[transition.lower()])
+        self.transition_elapsed_sig.put(elapsed)
+        self.transition_total_sig.put(total)
+
+    def _handle_step(self, info: tuple[Any, ...]) -> None:
+        """Monitor handler for step done messages."""
+        self.step_value_sig.put(self.step_value_sig.get() + 1)
+        self.step_done_sig.put(bool(info[1]))
+
+    def _handle_status(self, info: tuple[Any, ...]) -> None:
+        """
+        Monitor handler for normal status messages.
+
+        This is the default handler, used for every message that does not
+        have one of the special headers. Here the first element of the
+        message is the current or last transition.
+        """
+        (transition, state, config_alias, recording, bypass_activedet,
+         experiment_name, run_number, last_run_number) = info
+        transition = transition.lower()
+        if transition == 'endrun':
+            self.step_value_sig.put(1)
+        if transition == 'endstep':
+            self.step_done_sig.put(False)
+        trans_enum = self._transition_by_name[transition]
+        self.transition_sig.put(trans_enum)
+        if trans_enum is self._configure_transition:
+            self.configures_seen_sig.put(
+                self.configures_seen_sig.get() + 1
+            )
+        self.state_sig.put(self._state_by_name[state.lower()])
+        # Skip the fan-out for informational fields that did not change
+        values = (
+            config_alias,
+            recording,
+            bypass_activedet,
+            experiment_name,
+            run_number,
+            last_run_number,
+            0,
+            0,
+        )
+        primed = self._status_info_primed
+        for sig, value in zip(self._status_info_sigs, values):
+            if not primed or sig.get() != value:
+                sig.put(value)
+        self._status_info_primed = True
 
     @state_sig.sub_value
     def _configured_cb(
@@ -410,12 +673,58 @@ class DaqLCLS2(DaqBase):
         value : Optional[HelpfulIntEnum]
             The last updated value from state_sig
         """
-        if value is None:
-            self.configured_sig.put(False)
-        else:
-            self.configured_sig.put(
-                value >= self.state_enum.configured
-            )
+        self.configured_sig.put(self._is_configured_by_state.get(value, False))
+
+    def _update_cfg_cache(self, value: Any, obj: Signal, **kwargs) -> None:
+        """
+        Callback on the cached config signals to store their new values.
+        """
+        self._cfg_cache[obj.attr_name] = value
+
+    @recording_sig.sub_value
+    def _update_recording_cache(self, value: bool, **kwargs) -> None:
+        """
+        Callback on the recording signal to store the DAQ's recording state.
+        """
+        self._recording_cache = value
+
+    @detname_cfg.sub_value
+    @scantype_cfg.sub_value
+    def _update_step_doc_template(self, *args, **kwargs) -> None:
+        """
+        Callback on detname and scantype to rebuild the step docstring.
+
+        Only the step number changes from step to step, so we keep a
+        template with the rest of the docstring already filled in.
+        """
+        detname = str(self.detname_cfg.get()).replace('%', '%%')
+        scantype = str(self.scantype_cfg.get()).replace('%', '%%')
+        self._step_doc_template = (
+            f'{{"detname": "{detname}", }}'
+            f'{{"scantype": "{scantype}", }}'
+            '{"step": %s}'
+        )
+
+    @state_sig.sub_value
+    def _state_watcher_cb(self, value: Any, old_value: Any, **kwargs) -> None:
+        """
+        Callback on the state signal to update the active status watchers.
+        """
+        for check_state in self._state_watchers:
+            check_state(value=value, old_value=old_value)
+
+    @transition_sig.sub_value
+    def _transition_watcher_cb(
+        self,
+        value: Any,
+        old_value: Any,
+        **kwargs,
+    ) -> None:
+        """
+        Callback on the transition signal to update the active status watchers.
+        """
+        for check_transition in self._transition_watchers:
+            check_transition(value=value, old_value=old_value)
 
     @property
     def state(self) -> str:
@@ -444,11 +753,12 @@ class DaqLCLS2(DaqBase):
         end_run: ``bool``, optional
             If ``True``, end the run after we're done waiting.
         """
-        logger.debug(
-            "DaqLCLS2.wait(timeout=%s, end_run=%s)",
-            timeout,
-            end_run,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2.wait(timeout=%s, end_run=%s)",
+                timeout,
+                end_run,
+            )
         done_status = self._get_done_status(timeout=timeout, check_now=True)
         try:
             done_status.wait()
@@ -508,32 +818,33 @@ class DaqLCLS2(DaqBase):
             A status that will be marked successful after the corresponding
             states or transitions are reached.
         """
-        logger.debug(
-            "DaqLCLS2._get_status_for"
-            "(state=%s, transition=%s, timeout=%s, check_now=%s)",
-            state,
-            transition,
-            timeout,
-            check_now,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2._get_status_for"
+                "(state=%s, transition=%s, timeout=%s, check_now=%s)",
+                state,
+                transition,
+                timeout,
+                check_now,
+            )
         any_change = state is None and transition is None
         if state is None:
             state = {None}
             state_arg = False
         else:
-            state = self.state_enum.include(state)
+            state = self._normalize_enums(self.state_enum, state)
             state_arg = True
         if transition is None:
             transition = {None}
             trans_arg = False
         else:
-            transition = self.transition_enum.include(transition)
+            transition = self._normalize_enums(self.transition_enum, transition)
             trans_arg = True
 
         def check_state(value: Any, old_value: Any, **kwargs) -> None:
             """Call success if this value and last transition are correct."""
             nonlocal last_state
-            if value == old_value and not check_now:
+            if finished or (value == old_value and not check_now):
                 return
             with lock:
                 if (
@@ -547,7 +858,7 @@ class DaqLCLS2(DaqBase):
         def check_transition(value: Any, old_value: Any, **kwargs) -> None:
             """Call success if this value and last state are correct."""
             nonlocal last_transition
-            if value == old_value and not check_now:
+            if finished or (value == old_value and not check_now):
                 return
             with lock:
                 if (
@@ -560,6 +871,8 @@ class DaqLCLS2(DaqBase):
 
         def success() -> None:
             """Set the status as successfully finished if needed."""
+            nonlocal finished
+            finished = True
             try:
                 status.set_finished()
             except InvalidState:
@@ -567,32 +880,62 @@ class DaqLCLS2(DaqBase):
 
         def clean_up(status: Status) -> None:
             """
-            Undo the subscriptions once the status is done.
+            Remove our watchers once the status is done.
 
             Runs on successes, failures, and timeouts.
             """
-            if any_change or state_arg:
-                self.state_sig.unsubscribe(state_cbid)
-            if any_change or trans_arg:
-                self.transition_sig.unsubscribe(transition_cbid)
+            with self._watcher_lock:
+                if any_change or state_arg:
+                    self._state_watchers = tuple(
+                        cb for cb in self._state_watchers
+                        if cb is not check_state
+                    )
+                if any_change or trans_arg:
+                    self._transition_watchers = tuple(
+                        cb for cb in self._transition_watchers
+                        if cb is not check_transition
+                    )
 
         last_state = None
         last_transition = None
+        # The checks can run on the monitor thread or, with check_now, on
+        # the caller's thread. The lock makes each compare-and-store atomic
+        # so neither thread misses the other's value. The flag only skips
+        # checks once we are done, a duplicate set_finished is harmless.
         lock = threading.Lock()
+        finished = False
         status = Status(self, timeout=timeout)
-        if any_change or state_arg:
-            state_cbid = self.state_sig.subscribe(
-                check_state,
-                run=check_now,
-            )
-        if any_change or trans_arg:
-            transition_cbid = self.transition_sig.subscribe(
-                check_transition,
-                run=check_now,
-            )
+        with self._watcher_lock:
+            if any_change or state_arg:
+                self._state_watchers += (check_state,)
+            if any_change or trans_arg:
+                self._transition_watchers += (check_transition,)
+        if check_now:
+            if any_change or state_arg:
+                value = self.state_sig.get()
+                check_state(value=value, old_value=value)
+            if any_change or trans_arg:
+                value = self.transition_sig.get()
+                check_transition(value=value, old_value=value)
         status.add_callback(clean_up)
         return status
 
+    @staticmethod
+    def _normalize_enums(
+        enum: type[HelpfulIntEnum],
+        identifiers: Iterator[EnumId],
+    ) -> set[HelpfulIntEnum]:
+        """
+        Like enum.include, but members of enum are used as-is.
+
+        HelpfulIntEnum.from_any tries a name lookup first, which raises and
+        catches a KeyError for every identifier that is already a member.
+        """
+        return {
+            ident if isinstance(ident, enum) else enum.from_any(ident)
+            for ident in identifiers
+        }
+
     def _get_done_status(
         self,
         timeout: float | None = None,
@@ -620,15 +963,14 @@ class DaqLCLS2(DaqBase):
             A status that is marked successful once the DAQ is done
             acquiring.
         """
-        logger.debug(
-            "DaqLCLS2._get_done_status(timeout=%s, check_now=%s)",
-            timeout,
-            check_now,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2._get_done_status(timeout=%s, check_now=%s)",
+                timeout,
+                check_now,
+            )
         return self._get_status_for(
-            transition=self.transition_enum.exclude(
-                ['beginrun', 'beginstep', 'enable']
-            ),
+            transition=self._not_running_transitions,
             timeout=timeout,
             check_now=check_now,
         )
@@ -675,27 +1017,31 @@ class DaqLCLS2(DaqBase):
             A status object that is marked done when the transition has
             completed.
         """
-        logger.debug(
-            "DaqLCLS2._state_transition(state=%s, timeout=%s, wait=%s)",
-            state,
-            timeout,
-            wait,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2._state_transition(state=%s, timeout=%s, wait=%s)",
+                state,
+                timeout,
+                wait,
+            )
         # Normalize state
         state = self.state_enum.from_any(state)
+        current_state = self.state_sig.get()
+        events = self.events_cfg.get()
+        duration = self.duration_cfg.get()
         # Determine what extra info to send to the DAQ
         phase1_info = {}
-        if self.state_sig.get() < self.state_enum.configured <= state:
+        if current_state < self._configured_state <= state:
             # configure transition
             phase1_info['configure'] = self._get_phase1('Configure')
-        if self.state_sig.get() < self.state_enum.paused <= state:
+        if current_state < self._paused_state <= state:
             # beginstep transition
             phase1_info['beginstep'] = self._get_phase1('BeginStep')
-        if self.state_sig.get() < self.state_enum.running <= state:
+        if current_state < self._running_state <= state:
             # enable transition:
             phase1_info['enable'] = {
                 # this is the event count, 0 means run forever
-                'readout_count': self.events_cfg.get(),
+                'readout_count': events,
                 'group_mask': self.group_mask_cfg.get(),
             }
         # Get a status to track the transition's success or failure
@@ -704,25 +1050,14 @@ class DaqLCLS2(DaqBase):
             timeout=timeout,
         )
         # Set the transition in background thread, can be blocking
-        trans_thread = threading.Thread(
-            target=self._transition_thread,
-            args=(state.name, phase1_info, status),
-        )
-        trans_thread.daemon = True
-        trans_thread.start()
-        # Handle duration ourselves in another thread for LCLS1 compat
+        self._transition_queue.put((state.name, phase1_info, status))
+        # Handle duration ourselves with a timer for LCLS1 compat
         if (
-            state == self.state_enum.running
-            and self.events_cfg.get() == 0
-            and self.duration_cfg.get() > 0
+            state == self._running_state
+            and events == 0
+            and duration > 0
         ):
-            logger.debug("Starting duration handler")
-            duration_thread = threading.Thread(
-                target=self._handle_duration_thread,
-                args=(self.duration_cfg.get(), status)
-            )
-            duration_thread.daemon = True
-            duration_thread.start()
+            self._arm_duration(duration, status)
 
         # Keep count to check for out of process configures
         if 'configure' in phase1_info:
@@ -758,11 +1093,12 @@ class DaqLCLS2(DaqBase):
             The status returned by _state_transition, so that we can
             mark it as failed if there is a problem here.
         """
-        logger.debug(
-            "DaqLCLS2._transition_thread(state=%s, phase1_info=%s)",
-            state,
-            phase1_info,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2._transition_thread(state=%s, phase1_info=%s)",
+                state,
+                phase1_info,
+            )
         error_msg = self._control.setState(state, phase1_info)
         self.last_transition_err_sig.put(error_msg)
         if error_msg is not None:
@@ -773,21 +1109,22 @@ class DaqLCLS2(DaqBase):
                 )
             )
 
-    def _handle_duration_thread(
+    def _arm_duration(
         self,
         duration: float,
         running_status: Status,
     ) -> None:
         """
-        Wait a fixed amount of time, then stop the daq.
+        Stop the daq after a fixed amount of time in the running state.
 
         The LCLS1 DAQ supported a duration argument that allowed us to
         request fixed-length runs instead of fixed-events runs.
         This is used to emulate that behavior.
 
-        This avoids desynchronous behavior like starting the DAQ again
-        at an inappropriate time after a cancelled run by ending early
-        if the DAQ stops by any other means.
+        A timer is started once we reach the running state. It is
+        cancelled if the DAQ stops by any other means, which avoids
+        desynchronous behavior like starting the DAQ again at an
+        inappropriate time after a cancelled run.
 
         Parameters
         ----------
@@ -798,45 +1135,60 @@ class DaqLCLS2(DaqBase):
             start the timer appropriately.
             Note: this is the state transition to "running"
         """
-        logger.debug(
-            "DaqLCLS2._handle_duration_thread(duration=%s)",
-            duration,
-        )
-        try:
-            running_status.wait()
-        except Exception:
-            logger.debug("Never made it to running, abort duration thread")
-            return
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2._arm_duration(duration=%s)",
+                duration,
+            )
 
-        end_status = self._get_status_for(
-            state=['starting'],
-            transition=['endstep'],
-            check_now=False,
-        )
+        def start_timer(status: Status) -> None:
+            if not status.success:
+                logger.debug("Never made it to running, abort duration timer")
+                return
+            end_status = self._get_status_for(
+                state=['starting'],
+                transition=['endstep'],
+                check_now=False,
+            )
+            timer = threading.Timer(
+                duration,
+                self._duration_expired,
+                args=(end_status,),
+            )
+            timer.daemon = True
 
-        # Handle timeouts and waits ourselves to avoid annoying ophyd message
-        end_event = threading.Event()
+            def cancel(*args, **kwargs):
+                timer.cancel()
 
-        def done(*args, **kwargs):
-            end_event.set()
+            # Runs immediately if the DAQ has already stopped
+            end_status.add_callback(cancel)
+            timer.start()
 
-        end_status.add_callback(done)
-        end_event.wait(timeout=duration)
+        running_status.add_callback(start_timer)
 
+    def _duration_expired(self, end_status: Status) -> None:
+        """
+        Timer callback from _arm_duration: stop the DAQ if it is still running.
+
+        Parameters
+        ----------
+        end_status : Status
+            A status that is marked done when the DAQ stops on its own.
+        """
         if end_status.done:
-            logger.debug("Duration thread ending, DAQ already stopped.")
-        else:
-            logger.debug("Duration thread expired, stopping the DAQ.")
-            try:
-                end_status.set_finished()
-            except Exception:
-                pass
-            # Time to stop the DAQ
-            self._state_transition(
-                'starting',
-                wait=True,
-                timeout=self.begin_timeout_cfg.get(),
-            )
+            logger.debug("Duration timer expired, DAQ already stopped.")
+            return
+        logger.debug("Duration timer expired, stopping the DAQ.")
+        try:
+            end_status.set_finished()
+        except Exception:
+            pass
+        # Time to stop the DAQ
+        self._state_transition(
+            'starting',
+            wait=True,
+            timeout=self.begin_timeout_cfg.get(),
+        )
 
     def _get_phase1(self, transition: str) -> dict[str, Any]:
         """
@@ -857,7 +1209,8 @@ class DaqLCLS2(DaqBase):
         phase1_info : dict[str, Any]
             The data to send to the DAQ.
         """
-        logger.debug("DaqLCLS2._get_phase1(transition=%s)", transition)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DaqLCLS2._get_phase1(transition=%s)", transition)
         if transition == 'Configure':
             phase1_key = 'NamesBlockHex'
         elif transition == 'BeginStep':
@@ -865,21 +1218,71 @@ class DaqLCLS2(DaqBase):
         else:
             raise RuntimeError('Only Configure and BeginStep are supported.')
 
+        key = (
+            transition,
+            self.detname_cfg.get(),
+            self.scantype_cfg.get(),
+            self.serial_number_cfg.get(),
+            self.alg_name_cfg.get(),
+            tuple(self.alg_version_cfg.get()),
+            tuple(self._get_motors_for_transition().items()),
+        )
+        # Configure blocks are always fresh, each configure clears the cache.
+        # The key includes the step number, so hits only come from a later
+        # run repeating a step with the same controls values.
+        cacheable = transition == 'BeginStep'
+        if cacheable:
+            try:
+                hash(key)
+            except TypeError:
+                # Some controls values are unhashable, skip the cache
+                cacheable = False
+        if cacheable:
+            block = self._block_cache.get(key)
+            if block is not None:
+                return {phase1_key: block}
+        block = self._make_block(*key)
+        # getBlock returns None on failure, let the next step try again
+        if cacheable and block is not None:
+            if len(self._block_cache) >= self._block_cache_max:
+                # Drop the oldest entry
+                del self._block_cache[next(iter(self._block_cache))]
+            self._block_cache[key] = block
+        return {phase1_key: block}
+
+    def _make_block(
+        self,
+        transition: str,
+        detname: str,
+        scantype: str,
+        serial_number: str,
+        alg_name: str,
+        alg_version: tuple[int, ...],
+        motors: tuple[tuple[str, Any], ...],
+    ) -> Any:
+        """
+        Ask the DAQ to assemble the data block for a transition.
+
+        _get_phase1 caches the BeginStep results on these inputs, so a
+        run that repeats a step number and controls values from an earlier
+        run in the same configuration doesn't need to go back to the DAQ.
+        """
         data = {
-            'motors': self._get_motors_for_transition(),
+            'motors': dict(motors),
             'timestamp': 0,
-            'detname': self.detname_cfg.get(),
+            'detname': detname,
             'dettype': 'scan',
-            'scantype': self.scantype_cfg.get(),
-            'serial_number': self.serial_number_cfg.get(),
-            'alg_name': self.alg_name_cfg.get(),
-            'alg_version': self.alg_version_cfg.get(),
+            'scantype': scantype,
+            'serial_number': serial_number,
+            'alg_name': alg_name,
+            'alg_version': list(alg_version),
         }
-        logger.debug(
-            'Assembling block for transition=%s, data=%s',
-            transition,
-            data,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'Assembling block for transition=%s, data=%s',
+                transition,
+                data,
+            )
         try:
             data['transitionid'] = ControlDef.transitionId[transition]
         except KeyError as exc:
@@ -893,8 +1296,7 @@ class DaqLCLS2(DaqBase):
             data["add_shapes_data"] = True
 
         data["namesid"] = ControlDef.STEPINFO
-        block = self._control.getBlock(data=data)
-        return {phase1_key: block}
+        return self._control.getBlock(data=data)
 
     def _get_motors_for_transition(self) -> dict[str, Any]:
         """
@@ -920,27 +1322,21 @@ class DaqLCLS2(DaqBase):
 
         # Always includes a step value, and let the user override it
         step_value = self.step_value_sig.get()
-
+        # Gather all the other controls/motors in the same pass
+        other_controls = {}
         for ctrl in controls:
             name = get_controls_name(ctrl)
+            value = get_controls_value(ctrl)
             if name == ControlDef.STEP_VALUE:
-                step_value = get_controls_value(ctrl)
+                step_value = value
+            else:
+                other_controls[name] = value
 
         data = {
             'step_value': step_value,
-            'step_docstring': (
-                f'{{"detname": "{self.detname_cfg.get()}", }}'
-                f'{{"scantype": "{self.scantype_cfg.get()}", }}'
-                f'{{"step": {step_value}}}'
-            )
+            'step_docstring': self._step_doc_template % (step_value,),
         }
-
-        # Add all the other controls/motors
-        for ctrl in controls:
-            name = get_controls_name(ctrl)
-            if name != ControlDef.STEP_VALUE:
-                data[name] = get_controls_value(ctrl)
-
+        data.update(other_controls)
         return data
 
     def begin(
@@ -1032,45 +1428,14 @@ class DaqLCLS2(DaqBase):
             The version numbers [major, minor, bugfix] associated with
             alg_name. Defaults to [1, 0, 0].
         """
-        logger.debug(
-            "DaqLCLS2.begin(wait=%s, end_run=%s, "
-            "events=%s, duration=%s, record=%s, controls=%s, motors=%s, "
-            "begin_timeout=%s, begin_sleep=%s, group_mask=%s, detname=%s, "
-            "scantype=%s, serial_number=%s, alg_name=%s, alg_version=%s, "
-            ")",
-            wait,
-            end_run,
-            events,
-            duration,
-            record,
-            controls,
-            motors,
-            begin_timeout,
-            begin_sleep,
-            group_mask,
-            detname,
-            scantype,
-            serial_number,
-            alg_name,
-            alg_version,
-        )
-        super().begin(
-            wait=wait,
-            end_run=end_run,
-            events=events,
-            duration=duration,
-            record=record,
-            controls=controls,
-            motors=motors,
-            begin_timeout=begin_timeout,
-            begin_sleep=begin_sleep,
-            group_mask=group_mask,
-            detname=detname,
-            scantype=scantype,
-            serial_number=serial_number,
-            alg_name=alg_name,
-            alg_version=alg_version,
-        )
+        # Only forward the arguments that were actually passed in
+        args = locals()
+        kwargs = {
+            name: args[name] for name in self._config_arg_names
+            if args[name] is not CONFIG_VAL
+        }
+        # DaqBase.begin logs the same wait, end_run, and kwargs
+        super().begin(wait=wait, end_run=end_run, **kwargs)
 
     def _end_run_callback(self, status: Status) -> None:
         """
@@ -1081,7 +1446,6 @@ class DaqLCLS2(DaqBase):
 
         Regardless of the input, this will end the run.
         """
-        logger.debug("DaqLCLS2._end_run_callback(status=%s)", status)
         self.end_run()
 
     def begin_infinite(self, **kwargs) -> None:
@@ -1091,22 +1455,26 @@ class DaqLCLS2(DaqBase):
         This is a shortcut included so that the user does not have to remember
         the specifics of how to get the daq to run indefinitely.
 
-        kwargs are passed directly to begin, except for events and duration
-        which cannot be specified here. These arguments will be ignored, as
-        they need to be specified in a specific way to make the DAQ run
+        kwargs are passed directly to DaqBase.begin, skipping the
+        DaqLCLS2.begin signature, except for events and duration which
+        cannot be specified here. These arguments will be ignored, as they
+        need to be specified in a specific way to make the DAQ run
         infinitely.
         """
-        logger.debug("DaqLCLS2.begin_infinite(kwargs=%s)", kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DaqLCLS2.begin_infinite(kwargs=%s)", kwargs)
         kwargs['events'] = 0
         kwargs.pop('duration', None)
-        self.begin(**kwargs)
+        # Skip our begin override, it only filters and forwards kwargs
+        super().begin(**kwargs)
 
     @property
     def _infinite_run(self) -> bool:
         """
         True if the DAQ is configured to run forever.
         """
-        return self.events_cfg.get() == 0 and self.duration_cfg.get() == 0
+        cache = self._cfg_cache
+        return cache['events_cfg'] == 0 and cache['duration_cfg'] == 0
 
     def stop(
         self,
@@ -1131,8 +1499,8 @@ class DaqLCLS2(DaqBase):
             This also allows us to raise an exception if there is a
             transition error.
         """
-        logger.debug("DaqLCLS2.stop(success=%s)", success)
-        if self.state_sig.get() > self.state_enum.starting:
+        logger.log(TRACE, "DaqLCLS2.stop(success=%s)", success)
+        if self.state_sig.get() > self._starting_state:
             self._state_transition('starting', timeout=timeout, wait=wait)
 
     def end_run(
@@ -1155,7 +1523,7 @@ class DaqLCLS2(DaqBase):
             transition error.
         """
         logger.debug("DaqLCLS2.end_run()")
-        if self.state_sig.get() > self.state_enum.configured:
+        if self.state_sig.get() > self._configured_state:
             self._state_transition('configured', timeout=timeout, wait=wait)
 
     def trigger(self) -> Status:
@@ -1180,12 +1548,12 @@ class DaqLCLS2(DaqBase):
             This may fail with a DaqStateTransitionError or with a
             StatusTimeoutError as appropriate.
         """
-        logger.debug("DaqLCLS2.trigger()")
+        logger.log(TRACE, "DaqLCLS2.trigger()")
         trigger_status = self._get_status_for(
             state=['starting'],
             transition=['endstep'],
             check_now=False,
-            timeout=self.begin_timeout_cfg.get(),
+            timeout=self._cfg_cache['begin_timeout_cfg'],
         )
 
         def check_kickoff_fail(st: Status):
@@ -1238,10 +1606,11 @@ class DaqLCLS2(DaqBase):
             fails or times out. This will either be a
             DaqStateTransitionError or a StatusTimeoutError
         """
-        logger.debug("DaqLCLS2.kickoff()")
-        if self.state_sig.get() < self.state_enum.connected:
+        logger.log(TRACE, "DaqLCLS2.kickoff()")
+        state = self.state_sig.get()
+        if state < self._connected_state:
             raise RuntimeError('DAQ is not ready to run!')
-        if self.state_sig.get() == self.state_enum.running:
+        if state == self._running_state:
             raise RuntimeError('DAQ is already running!')
 
         original_config = self.config
@@ -1269,7 +1638,7 @@ class DaqLCLS2(DaqBase):
 
         Called whenenever a step is completed (e.g. we took enough events).
         """
-        if value and self.state_sig.get() == self.state_enum.running:
+        if value and self.state_sig.get() == self._running_state:
             # This handles its own errors well enough
             # See _transition_thread
             self._state_transition(
@@ -1289,20 +1658,25 @@ class DaqLCLS2(DaqBase):
             ``Status`` that will be marked as done when the DAQ has finished
             acquiring
         """
-        logger.debug("DaqLCLS2.complete()")
+        logger.log(TRACE, "DaqLCLS2.complete()")
         done_status = self._get_done_status(check_now=True)
         if self._infinite_run:
             # Configured to run forever
             self.stop()
         return done_status
 
-    def _enforce_config(self, name, value):
+    @staticmethod
+    def _enforce_config(
+        name: str,
+        value: Any,
+        checks: dict[str, tuple[Any, tuple[type, ...]]],
+    ) -> None:
         """
         Raises a TypeError if the config argument has the wrong type.
 
-        This is implemented by inspecting the type hint associated with
-        the name parameter and comparing it with the type of the input
-        value.
+        This is implemented by checking the input value against the
+        classes precomputed from the type hint associated with the name
+        parameter.
 
         Parameters
         ----------
@@ -1311,9 +1685,15 @@ class DaqLCLS2(DaqBase):
             or "preconfig" associated with value.
         value : Any
             The actual value that was passed into "configure" or "preconfig".
+        checks : dict[str, tuple[Any, tuple[type, ...]]]
+            The type hint and the classes it allows for each argument of
+            preconfig, from _config_checks.
         """
-        hint = get_type_hints(self.preconfig)[name]
-        if not typing_check(value, hint):
+        # Every config hint accepts None and the CONFIG_VAL sentinel
+        if value is None or value is CONFIG_VAL:
+            return
+        hint, classes = checks[name]
+        if not isinstance(value, classes):
             raise TypeError(
                 f'Incorrect type for {name}={value}, expected {hint} '
                 f'but got {type(value)}'
@@ -1421,13 +1801,30 @@ class DaqLCLS2(DaqBase):
             If True, we'll show what the next configuration will be
             as a nice log message.
         """
-        logger.debug(
-            "DaqLCLS2.preconfig("
-            "events=%s, duration=%s, record=%s, controls=%s, motors=%s, "
-            "begin_timeout=%s, begin_sleep=%s, group_mask=%s, detname=%s, "
-            "scantype=%s, serial_number=%s, alg_name=%s, alg_version=%s, "
-            "show_queued_cfg=%s"
-            ")",
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DaqLCLS2.preconfig("
+                "events=%s, duration=%s, record=%s, controls=%s, motors=%s, "
+                "begin_timeout=%s, begin_sleep=%s, group_mask=%s, detname=%s, "
+                "scantype=%s, serial_number=%s, alg_name=%s, alg_version=%s, "
+                "show_queued_cfg=%s"
+                ")",
+                events,
+                duration,
+                record,
+                controls,
+                motors,
+                begin_timeout,
+                begin_sleep,
+                group_mask,
+                detname,
+                scantype,
+                serial_number,
+                alg_name,
+                alg_version,
+                show_queued_cfg,
+            )
+        values = (
             events,
             duration,
             record,
@@ -1441,30 +1838,22 @@ class DaqLCLS2(DaqBase):
             serial_number,
             alg_name,
             alg_version,
-            show_queued_cfg,
         )
-        self._enforce_config('events', events)
-        self._enforce_config('duration', duration)
-        self._enforce_config('record', record)
-        self._enforce_config('controls', controls)
-        self._enforce_config('motors', motors)
-        self._enforce_config('begin_timeout', begin_timeout)
-        self._enforce_config('begin_sleep', begin_sleep)
-        self._enforce_config('group_mask', group_mask)
-        self._enforce_config('detname', detname)
-        self._enforce_config('scantype', scantype)
-        self._enforce_config('serial_number', serial_number)
-        self._enforce_config('alg_name', alg_name)
-        self._enforce_config('alg_version', alg_version)
+        # Unchanged arguments are always valid, only check the rest
+        checks = _config_checks(type(self).preconfig)
+        for name, value in zip(self._config_arg_names, values):
+            if value is not CONFIG_VAL:
+                self._enforce_config(name, value, checks)
 
         # Enforce only events or duration, not both
-        if isinstance(events, int):
+        # These were type-checked above, so anything else is a number
+        if events is not CONFIG_VAL and events is not None:
             duration = 0
-        elif isinstance(duration, Real):
+        elif duration is not CONFIG_VAL and duration is not None:
             duration = float(duration)
             events = 0
         # Handle motors as an alias for controls
-        if not isinstance(motors, Sentinel):
+        if motors is not CONFIG_VAL:
             controls = motors
         # Call super
         super().preconfig(
@@ -1583,7 +1972,6 @@ class DaqLCLS2(DaqBase):
             This is used internally by bluesky when we include
             "configure" in a plan.
         """
-        logger.debug("DaqLCLS2.configure, passing to super")
         old, new = super().configure(
             events=events,
             duration=duration,
@@ -1599,20 +1987,21 @@ class DaqLCLS2(DaqBase):
             alg_name=alg_name,
             alg_version=alg_version,
         )
+        configures_requested = self.configures_requested_sig.get()
         other_proc_configured = (
-            self.configures_seen_sig.get()
-            != self.configures_requested_sig.get()
+            self.configures_seen_sig.get() != configures_requested
         )
-        first_configure = self.configures_requested_sig.get() == 0
+        first_configure = configures_requested == 0
         # Cause a transition if we need to
         if any((
             self._queue_configure_transition,
             other_proc_configured,
             first_configure,
         )):
-            if self.state_sig.get() < self.state_enum.connected:
+            state = self.state_sig.get()
+            if state < self._connected_state:
                 raise RuntimeError('Not ready to configure.')
-            if self.state_sig.get() > self.state_enum.configured:
+            if state > self._configured_state:
                 raise RuntimeError(
                     'Cannot configure transition during an open run!'
                 )
@@ -1620,7 +2009,9 @@ class DaqLCLS2(DaqBase):
                 # Reset the counters now, before we count this configure
                 self.configures_seen_sig.put(0)
                 self.configures_requested_sig.put(0)
-            if self.state_sig.get() == self.state_enum.configured:
+            # Start the new configuration with fresh data blocks
+            self._block_cache.clear()
+            if state == self._configured_state:
                 # Already configured, so we should unconfigure first
                 self._state_transition(
                     'connected',
@@ -1640,8 +2031,8 @@ class DaqLCLS2(DaqBase):
         rec_cfg = self.record_cfg.get()
         if rec_cfg is not TernaryBool.NONE:
             new_rec = bool(rec_cfg)
-            if self.recording_sig.get() != new_rec:
-                if self.state_sig.get() > self.state_enum.configured:
+            if self._recording_cache != new_rec:
+                if self.state_sig.get() > self._configured_state:
                     raise RuntimeError(
                         'Cannot change recording state during an open run!'
                     )
@@ -1718,7 +2109,7 @@ class DaqLCLS2(DaqBase):
             This also allows us to raise an exception if there is a
             transition error.
         """
-        if self.state_sig.get() == self.state_enum.running:
+        if self.state_sig.get() == self._running_state:
             self._state_transition('paused', timeout=timeout, wait=wait)
 
     def resume(self, timeout: float = 10.0, wait: bool = True) -> None:
@@ -1746,9 +2137,10 @@ class DaqLCLS2(DaqBase):
             This also allows us to raise an exception if there is a
             transition error.
         """
-        if self.state_sig.get() == self.state_enum.paused:
+        state = self.state_sig.get()
+        if state == self._paused_state:
             self._state_transition('running', timeout=timeout, wait=wait)
-        elif self.state_sig.get() < self.state_enum.paused:
+        elif state < self._paused_state:
             self.kickoff().wait(timeout=timeout)
 
     def run_number(self) -> int:
@@ -1778,11 +2170,29 @@ class DaqLCLS2(DaqBase):
         return status
 
 
-class SimDaqControl:
+@cache
+def _sim_enums() -> tuple[type[HelpfulIntEnum], ...]:
     """
-    Emulation of DaqControl for basic offline tests.
+    The header, state, and transition enums shared by every SimDaqControl.
+
+    These are built on first use rather than at import because ControlDef
+    is an optional dependency.
     """
-    _tmap = {
+    return (
+        HelpfulIntEnum(
+            'ValidHeaders',
+            ['status', 'error', 'warning', 'filereport', 'progress', 'step']
+        ),
+        HelpfulIntEnum('States', ControlDef.states),
+        HelpfulIntEnum('Trans', ControlDef.transitions),
+    )
+
+
+# Filler for the unused fields of short sim monitor messages
+_SIM_STATUS_PAD = ('error',) * 8
+# Sim transitions: current state -> {next state: transition}
+_SIM_TMAP = MappingProxyType({
+    now: MappingProxyType(goals) for now, goals in {
         'reset': {
             'unallocated': 'rollcall',
         },
@@ -1812,7 +2222,59 @@ class SimDaqControl:
         'running': {
             'paused': 'disable',
         },
-    }
+    }.items()
+})
+
+
+@cache
+def _sim_tmap_int() -> Mapping[tuple[int, int], HelpfulIntEnum]:
+    """
+    _SIM_TMAP as (from state, to state) values -> transition member.
+
+    Built once from the shared sim enums, see _sim_enums.
+    """
+    _, states, transitions = _sim_enums()
+    return MappingProxyType({
+        (states[now].value, states[goal].value): transitions[transition]
+        for now, goals in _SIM_TMAP.items()
+        for goal, transition in goals.items()
+    })
+
+
+class SimDaqControl:
+    """
+    Emulation of DaqControl for basic offline tests.
+    """
+    __slots__ = (
+        '_lock',
+        '_status_ready',
+        '_status_queue',
+        '_last_status',
+        '_headers',
+        '_states',
+        '_transitions',
+        '_tmap_int',
+        '_recording',
+        '_experiment_name',
+        '_run_number',
+        '_last_run_number',
+        '_config_alias',
+        '_bypass_activedet',
+        '_elapsed',
+        '_total',
+        '_step_done',
+        '_error',
+        '_warning',
+        '_path',
+        '_cause_error',
+        '_step_timer',
+        '_step_gen',
+        '_payloads',
+        '_transition',
+        '_state',
+        '_state_int',
+    )
+    _tmap = _SIM_TMAP
 
     def __init__(self, *args, **kwargs):
         logger.debug("SimDaqControl.__init__(%s, %s)", args, kwargs)
@@ -1821,14 +2283,13 @@ class SimDaqControl:
                 'Optional dependency psdaq is not installed, '
                 'cannot run lcls2 daq'
             )
-        self._lock = threading.RLock()
-        self._new_status = threading.Event()
-        self._headers = HelpfulIntEnum(
-            'ValidHeaders',
-            ['status', 'error', 'warning', 'filereport', 'progress', 'step']
-        )
-        self._states = HelpfulIntEnum('States', ControlDef.states)
-        self._transitions = HelpfulIntEnum('Trans', ControlDef.transitions)
+        self._lock = threading.Lock()
+        # Status messages are built when emitted and queued for the monitor
+        self._status_ready = threading.Condition(self._lock)
+        self._status_queue = deque(maxlen=16)
+        self._last_status = None
+        self._headers, self._states, self._transitions = _sim_enums()
+        self._tmap_int = _sim_tmap_int()
         self._recording = False
         self._experiment_name = 'tst0000'
         self._run_number = 0
@@ -1842,6 +2303,32 @@ class SimDaqControl:
         self._warning = ''
         self._path = 'tst'
         self._cause_error = False
+        self._step_timer = None
+        # Incremented per scheduled step end so stale timers do nothing
+        self._step_gen = 0
+        # Builds the message fields for each header from the sim state
+        self._payloads = {
+            self._headers.status: lambda: (
+                self._transition,
+                self._state,
+                self._config_alias,
+                self._recording,
+                self._bypass_activedet,
+                self._experiment_name,
+                self._run_number,
+                self._last_run_number,
+            ),
+            self._headers.error: lambda: ('error', self._error),
+            self._headers.warning: lambda: ('warning', self._warning),
+            self._headers.filereport: lambda: ('fileReport', self._path),
+            self._headers.progress: lambda: (
+                'progress',
+                self._transition,
+                self._elapsed,
+                self._total,
+            ),
+            self._headers.step: lambda: ('step', self._step_done),
+        }
         self.sim_set_states('reset', 'reset')
 
     def getStatus(self) -> tuple[str, str, str, str, str, str, str, str]:
@@ -1861,41 +2348,11 @@ class SimDaqControl:
     def monitorStatus(self) -> tuple[str, str, str, str, str, str, str, str]:
         """Wait, then return the next updated status when it changes."""
         logger.debug('SimDaqControl.monitorStatus() requested')
-        self._new_status.wait()
-        with self._lock:
+        with self._status_ready:
+            while not self._status_queue:
+                self._status_ready.wait()
             logger.debug('SimDaqControl sending new status')
-            self._new_status.clear()
-            if self._header == self._headers.status:
-                status = [
-                    self._transition,
-                    self._state,
-                    self._config_alias,
-                    self._recording,
-                    self._bypass_activedet,
-                    self._experiment_name,
-                    self._run_number,
-                    self._last_run_number,
-                ]
-            elif self._header == self._headers.error:
-                status = ['error', self._error]
-            elif self._header == self._headers.warning:
-                status = ['warning', self._warning]
-            elif self._header == self._headers.filereport:
-                status = ['fileReport', self._path]
-            elif self._header == self._headers.progress:
-                status = [
-                    'progress',
-                    self._transition,
-                    self._elapsed,
-                    self._total,
-                ]
-            elif self._header == self._headers.step:
-                status = ['step', self._step_done]
-            else:
-                raise RuntimeError('Error in sim, bad header')
-        while len(status) < 8:
-            status.append('error')
-        return tuple(status)
+            return self._status_queue.popleft()
 
     def setState(
         self,
@@ -1910,44 +2367,72 @@ class SimDaqControl:
 
         Returns a str if there is an error.
         """
-        logger.debug('SimDaqControl.setState(%s, %s)', state, phase1_info)
         with self._lock:
-            state = self._states.from_any(state)
-            if state == self._states.reset:
-                return self.sim_transition('reset')
+            return self._set_state_locked(state, phase1_info)
 
-            now = self._states.from_any(self._state)
-            if state == now:
-                return
-            if state.value > now.value:
-                goal_indices = range(now.value + 1, state.value + 1)
-            else:
-                goal_indices = range(now.value - 1, state.value - 1, -1)
-            for goal in goal_indices:
-                error = self.sim_transition(goal)
-                if error is not None:
-                    return error
-
-            if state == self._states.running:
-                # We need to schedule end_step
-                self._step_done = False
-                try:
-                    events = phase1_info['enable']['readout_count']
-                except KeyError:
-                    events = 0
-                if events > 0:
-                    threading.Thread(
-                        target=self._end_step_thread,
-                        args=(events,)
-                    ).start()
-
-    def _end_step_thread(self, events: int) -> None:
-        """The DAQ should stop after the step's events elapse"""
-        time.sleep(events/120)
-        if self._state == 'running':
-            logger.debug('SimDaqControl ending step')
-            self._step_done = True
-            self.sim_new_status(self._headers.step)
+    def _set_state_locked(
+        self,
+        state: EnumId,
+        phase1_info: dict[str, Any],
+    ) -> str | None:
+        """setState, with the lock already held."""
+        logger.debug('SimDaqControl.setState(%s, %s)', state, phase1_info)
+        state = self._sim_enum(self._states, state)
+        if state == self._states.reset:
+            return self._sim_transition_locked('reset')
+
+        now = self._state_int
+        if state.value == now:
+            return
+        if state.value > now:
+            goal_indices = range(now + 1, state.value + 1)
+        else:
+            goal_indices = range(now - 1, state.value - 1, -1)
+        for goal in goal_indices:
+            error = self._sim_transition_locked(goal)
+            if error is not None:
+                return error
+
+        if state == self._states.running:
+            # We need to schedule end_step
+            self._step_done = False
+            try:
+                events = phase1_info['enable']['readout_count']
+            except KeyError:
+                events = 0
+            if events > 0:
+                # The DAQ should stop after the step's events elapse
+                self._step_gen += 1
+                self._step_timer = threading.Timer(
+                    events/120,
+                    self._end_step,
+                    args=(self._step_gen,),
+                )
+                self._step_timer.daemon = True
+                self._step_timer.start()
+
+    @staticmethod
+    def _sim_enum(
+        enum: type[HelpfulIntEnum],
+        identifier: EnumId,
+    ) -> HelpfulIntEnum:
+        """from_any, without the name lookups for members and int values."""
+        if isinstance(identifier, enum):
+            return identifier
+        if isinstance(identifier, int):
+            return enum(identifier)
+        return enum.from_any(identifier)
+
+    def _end_step(self, gen: int) -> None:
+        """Timer callback from setState to end step number gen."""
+        with self._lock:
+            if (
+                gen == self._step_gen
+                and self._state_int == self._states.running.value
+            ):
+                logger.debug('SimDaqControl ending step')
+                self._step_done = True
+                self._sim_new_status_locked(self._headers.step)
 
     def getBlock(
         self,
@@ -1966,7 +2451,7 @@ class SimDaqControl:
         logger.debug("SimDaqControl.setRecord(%s)", record)
         with self._lock:
             self._recording = record
-            self.sim_new_status(self._headers.status)
+            self._sim_new_status_locked(self._headers.status)
 
     def sim_set_states(
         self,
@@ -1974,43 +2459,76 @@ class SimDaqControl:
         state: EnumId,
     ) -> str | None:
         """Change the currently set state and emit update."""
-        logger.debug("SimDaqControl.sim_set_state(%s, %s)", transition, state)
         with self._lock:
-            if self._cause_error:
-                self._cause_error = False
-                self.sim_new_status(self._headers.error)
-                logger.debug("Sim returning error: %s", self._error)
-                return self._error
-            self._transition = self._transitions.from_any(transition).name
-            self._state = self._states.from_any(state).name
-            if self._transition == self._transitions.beginrun:
-                self._run_number += 1
-            elif self._transition == self._transitions.endrun:
-                self._last_run_number += 1
-            self.sim_new_status(self._headers.status)
+            return self._sim_set_states_locked(transition, state)
+
+    def _sim_set_states_locked(
+        self,
+        transition: EnumId,
+        state: EnumId,
+    ) -> str | None:
+        """sim_set_states, with the lock already held."""
+        logger.debug("SimDaqControl.sim_set_state(%s, %s)", transition, state)
+        if self._cause_error:
+            self._cause_error = False
+            self._sim_new_status_locked(self._headers.error)
+            logger.debug("Sim returning error: %s", self._error)
+            return self._error
+        self._transition = self._sim_enum(self._transitions, transition).name
+        state = self._sim_enum(self._states, state)
+        if state != self._states.running and self._step_timer is not None:
+            # Don't end a step that was already left
+            self._step_timer.cancel()
+            self._step_timer = None
+        self._state = state.name
+        self._state_int = state.value
+        if self._transition == self._transitions.beginrun:
+            self._run_number += 1
+        elif self._transition == self._transitions.endrun:
+            self._last_run_number += 1
+        self._sim_new_status_locked(self._headers.status)
 
     def sim_transition(self, state: EnumId) -> str | None:
         """Internal transition, checks if valid."""
-        logger.debug("SimDaqControl.sim_transition(%s)", state)
         with self._lock:
-            goal = self._states.from_any(state)
-            if goal == self._states.reset:
-                return self.sim_set_states('reset', 'reset')
-            now = self._states.from_any(self._state)
-            try:
-                transition = self._tmap[now.name][goal.name]
-            except KeyError:
-                raise RuntimeError(f'Invalid transition from {now} to {goal}')
-            error = self.sim_set_states(transition, goal.name)
-            if error is not None:
-                return error
+            return self._sim_transition_locked(state)
+
+    def _sim_transition_locked(self, state: EnumId) -> str | None:
+        """sim_transition, with the lock already held."""
+        logger.debug("SimDaqControl.sim_transition(%s)", state)
+        goal = self._sim_enum(self._states, state)
+        if goal == self._states.reset:
+            return self._sim_set_states_locked('reset', 'reset')
+        transition = self._tmap_int.get((self._state_int, goal.value))
+        if transition is None:
+            now = self._states(self._state_int)
+            raise RuntimeError(f'Invalid transition from {now} to {goal}')
+        error = self._sim_set_states_locked(transition, goal)
+        if error is not None:
+            return error
 
     def sim_new_status(self, header: HelpfulIntEnum) -> None:
         """Emit a status update."""
-        logger.debug("SimDaqControl.sim_new_status(%s)", header)
         with self._lock:
-            self._header = header
-            self._new_status.set()
+            self._sim_new_status_locked(header)
+
+    def _sim_new_status_locked(self, header: HelpfulIntEnum) -> None:
+        """sim_new_status, with the lock already held."""
+        logger.debug("SimDaqControl.sim_new_status(%s)", header)
+        try:
+            payload = self._payloads[header]
+        except KeyError:
+            raise RuntimeError('Error in sim, bad header')
+        # Messages always have 8 fields, fill the unused ones
+        status = payload()
+        status += _SIM_STATUS_PAD[len(status):]
+        if header == self._headers.status:
+            if status == self._last_status:
+                # Nothing changed since the last status, don't resend it
+                return
+            self._last_status = status
+        self._status_queue.append(status)
+        self._status_ready.notify()
 
     def sim_queue_error(self, message: str) -> None:
         """The next requested transition will error."""
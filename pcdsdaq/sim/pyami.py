@@ -29,6 +29,8 @@ def clear_l3t():
 
 
 class Entry:
+    __slots__ = ('_ami_name', '_filt', '_count', '_values', '_stats',
+                 '_stats_values')
     _connected = False
 
     def __init__(self, ami_name, ami_type, filter_string=None):
@@ -42,13 +44,23 @@ class Entry:
         self.clear()
 
     def get(self):
-        if len(self._values):
-            return dict(mean=np.mean(self._values),
-                        rms=np.std(self._values),
-                        entries=len(self._values))
-        else:
-            return dict(mean=0, rms=0, entries=0)
+        # Compute the stats once per set of values, tests may swap them
+        if self._stats is None or self._stats_values is not self._values:
+            self._stats_values = self._values
+            values = np.asarray(self._values, dtype=np.float64)
+            entries = len(values)
+            if entries:
+                # One pass for each moment, without a squared copy
+                mean = values.sum() / entries
+                var = np.dot(values, values) / entries - mean * mean
+                self._stats = dict(mean=mean,
+                                   rms=np.sqrt(max(var, 0)),
+                                   entries=entries)
+            else:
+                self._stats = dict(mean=0, rms=0, entries=0)
+        return dict(self._stats)
 
     def clear(self):
         self._count = random.randint(1, 100)
-        self._values = [random.random() for i in range(self._count)]
+        self._values = np.random.random(self._count)
+        self._stats = None
@@ -22,6 +22,7 @@ def test_ami_basic(ami_det):
     ami_det._entry._values = []
     # Should not error with no values collected
     stats = ami_det.get()
+    assert stats.entries == 0
 
 
 @pytest.mark.timeout(60)
@@ -1,7 +1,9 @@
+import copy
 import logging
 import time
 from contextlib import contextmanager
 from threading import Event
+from types import SimpleNamespace
 
 import bluesky.plan_stubs as bps
 import bluesky.plans as bp
@@ -14,7 +16,8 @@ from ophyd.sim import motor
 from ophyd.utils.errors import WaitTimeoutError
 
 from ..daq import DaqLCLS2
-from ..daq.interface import TernaryBool
+from ..daq.interface import CONFIG_VAL, TernaryBool
+from ..daq.lcls2 import SimDaqControl
 from ..exceptions import DaqStateTransitionError, DaqTimeoutError
 
 try:
@@ -39,7 +42,17 @@ def daq_lcls2(RE: RunEngine) -> DaqLCLS2:
     )
 
 
+@pytest.fixture(scope='function')
+def sim_control() -> SimDaqControl:
+    if ControlDef is None:
+        pytest.skip(reason='psdaq is not installed')
+    return SimDaqControl()
+
+
 def sig_wait_value(sig, goal, timeout=1, assert_success=True):
+    if sig.get() == goal:
+        # Already there, no need to set up a subscription
+        return
     ev = Event()
 
     def cb(value, **kwargs):
@@ -53,6 +66,36 @@ def sig_wait_value(sig, goal, timeout=1, assert_success=True):
         assert sig.get() == goal
 
 
+class FakeMonitorSocket:
+    """Stand-in for the DaqControl front_sub socket, for poll only."""
+    def __init__(self, control):
+        self.control = control
+        self.rcvtimeo = -1
+
+    def poll(self, timeout=None):
+        return len(self.control.messages)
+
+
+class FakeMonitorControl:
+    """Stand-in for DaqControl that replays scripted monitor messages."""
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.front_sub = FakeMonitorSocket(self)
+        self.read_timeouts = []
+
+    def getStatus(self):
+        return ('none', 'connected', 'BEAM', False, {}, 1, 'exp', 0, 0)
+
+    def monitorStatus(self):
+        self.read_timeouts.append(self.front_sub.rcvtimeo)
+        if not self.messages:
+            raise RuntimeError('would block')
+        msg = self.messages.pop(0)
+        if isinstance(msg, Exception):
+            raise msg
+        return msg
+
+
 @contextmanager
 def assert_timespan(min, max):
     start = time.monotonic()
@@ -89,16 +132,17 @@ def test_preconfig(daq_lcls2: DaqLCLS2):
         else:
             sig = getattr(daq_lcls2, keyword + '_cfg')
         orig = sig.get()
+        # Skip printing the queued config, we only check the signals
         for value in good_values:
-            daq_lcls2.preconfig(**{keyword: value})
+            daq_lcls2.preconfig(show_queued_cfg=False, **{keyword: value})
             assert sig.get() == value
         some_value = sig.get()
         daq_lcls2.preconfig(show_queued_cfg=False)
         assert sig.get() == some_value
         for value in bad_values:
             with pytest.raises(TypeError):
-                daq_lcls2.preconfig(**{keyword: value})
-        daq_lcls2.preconfig(**{keyword: None})
+                daq_lcls2.preconfig(show_queued_cfg=False, **{keyword: value})
+        daq_lcls2.preconfig(show_queued_cfg=False, **{keyword: None})
         assert sig.get() == orig
 
     test_one('events', (1, 10, 100), (45.3, 'peanuts', object()))
@@ -151,9 +195,24 @@ def test_record(daq_lcls2: DaqLCLS2):
     logger.debug('test_record')
 
     # Establish that recording_sig is a reliable proxy for _control state
-    for record in (True, False, True, False):
-        daq_lcls2._control.setRecord(record)
-        sig_wait_value(daq_lcls2.recording_sig, record)
+    # Subscribe once and move the goal, rather than once per value
+    goal = [None]
+    ev = Event()
+
+    def goal_reached(value, **kwargs):
+        if value == goal[0]:
+            ev.set()
+
+    cbid = daq_lcls2.recording_sig.subscribe(goal_reached, run=False)
+    try:
+        for record in (True, False, True, False):
+            goal[0] = record
+            ev.clear()
+            daq_lcls2._control.setRecord(record)
+            assert ev.wait(1.0)
+            assert daq_lcls2.recording_sig.get() == record
+    finally:
+        daq_lcls2.recording_sig.unsubscribe(cbid)
 
     # Establish that record setattr works
     for record in (True, False, True, False):
@@ -947,3 +1006,153 @@ def test_transition_errors(daq_lcls2: DaqLCLS2):
     daq_lcls2._control.sim_queue_error('cannot enable')
     with pytest.raises(DaqStateTransitionError):
         daq_lcls2.resume()
+
+
+def test_drain_monitor():
+    logger.debug('test_drain_monitor')
+    status = ('configure', 'configured', 'BEAM', False, 1, 'exp', 0, 0)
+    control = FakeMonitorControl([status] * 5)
+    daq = SimpleNamespace(_control=control, _monitor_batch_max=3)
+    # Bursts are read together, up to the batch limit
+    assert DaqLCLS2._drain_monitor(daq) == [status] * 3
+    assert len(control.messages) == 2
+    # Only the first read may block, and the timeout is restored
+    assert control.read_timeouts == [-1, 0, 0]
+    assert control.front_sub.rcvtimeo == -1
+    # A failed read ends the batch without losing what was read
+    control.messages = [status, status, RuntimeError('bad'), status]
+    assert DaqLCLS2._drain_monitor(daq) == [status] * 2
+    assert control.messages == [status]
+    assert control.front_sub.rcvtimeo == -1
+
+
+def test_monitor_progress_coalesce():
+    logger.debug('test_monitor_progress_coalesce')
+    pad = ('error',) * 4
+    first = ('progress', 'configure', 1, 3) + pad
+    second = ('progress', 'configure', 2, 3) + pad
+    status = ('configure', 'configured', 'BEAM', False, 1, 'exp', 0, 0)
+    last = ('progress', 'beginrun', 1, 3) + pad
+    handled = []
+
+    def drain():
+        daq._destroyed = True
+        return [first, second, status, last]
+
+    daq = SimpleNamespace(
+        _destroyed=False,
+        _control=FakeMonitorControl([]),
+        _monitor_dispatch={'progress': handled.append},
+        _handle_status=handled.append,
+        _drain_monitor=drain,
+    )
+    DaqLCLS2._monitor_thread(daq)
+    # Only the latest of back-to-back progress messages is handled
+    assert handled[1:] == [second, status, last]
+
+
+def test_sim_stale_step_end(sim_control: SimDaqControl):
+    logger.debug('test_sim_stale_step_end')
+    sim_control.sim_set_states('enable', 'running')
+    sim_control._step_gen = 2
+    # A timer left over from an earlier step must not end this one
+    sim_control._end_step(1)
+    assert not sim_control._step_done
+    sim_control._end_step(2)
+    assert sim_control._step_done
+
+
+def test_sim_duplicate_status(sim_control: SimDaqControl):
+    logger.debug('test_sim_duplicate_status')
+    sim_control._status_queue.clear()
+    sim_control.setRecord(True)
+    sim_control.setRecord(True)
+    # The second status is identical, so only one is sent
+    assert len(sim_control._status_queue) == 1
+    sim_control.setRecord(False)
+    assert len(sim_control._status_queue) == 2
+
+
+def test_step_docstring_percent(daq_lcls2: DaqLCLS2):
+    logger.debug('test_step_docstring_percent')
+    daq_lcls2.detname_cfg.put('det%s')
+    daq_lcls2.scantype_cfg.put('100%')
+    docstring = daq_lcls2._get_motors_for_transition()['step_docstring']
+    assert '"detname": "det%s"' in docstring
+    assert '"scantype": "100%"' in docstring
+    assert docstring.endswith(
+        f'{{"step": {daq_lcls2.step_value_sig.get()}}}'
+    )
+
+
+def test_block_cache(daq_lcls2: DaqLCLS2, monkeypatch):
+    logger.debug('test_block_cache')
+    calls = []
+    blocks = {}
+
+    def get_block(self, data):
+        calls.append(data['motors']['step_value'])
+        return blocks.get(data['motors']['step_value'], data)
+
+    monkeypatch.setattr(SimDaqControl, 'getBlock', get_block)
+    daq_lcls2._block_cache_max = 2
+    step = daq_lcls2.step_value_sig
+
+    # The same step number and controls values reuse the block
+    step.put(1)
+    first = daq_lcls2._get_phase1('BeginStep')
+    assert daq_lcls2._get_phase1('BeginStep') == first
+    assert calls == [1]
+
+    # A failed getBlock is not cached
+    blocks[2] = None
+    step.put(2)
+    assert daq_lcls2._get_phase1('BeginStep') == {'ShapesDataBlockHex': None}
+    daq_lcls2._get_phase1('BeginStep')
+    assert calls == [1, 2, 2]
+
+    # Past the limit, the oldest block is dropped
+    step.put(3)
+    daq_lcls2._get_phase1('BeginStep')
+    step.put(4)
+    daq_lcls2._get_phase1('BeginStep')
+    assert calls == [1, 2, 2, 3, 4]
+    step.put(1)
+    daq_lcls2._get_phase1('BeginStep')
+    assert calls == [1, 2, 2, 3, 4, 1]
+    step.put(4)
+    daq_lcls2._get_phase1('BeginStep')
+    assert calls == [1, 2, 2, 3, 4, 1]
+
+    # Configure never uses the cache
+    daq_lcls2._get_phase1('Configure')
+    daq_lcls2._get_phase1('Configure')
+    assert calls == [1, 2, 2, 3, 4, 1, 4, 4]
+
+
+def test_preconfig_copied_sentinel(daq_lcls2: DaqLCLS2):
+    logger.debug('test_preconfig_copied_sentinel')
+    events = daq_lcls2.events_cfg.get()
+    # Copied kwargs still hold the same sentinel, and are still skipped
+    kwargs = copy.deepcopy({'events': CONFIG_VAL})
+    assert kwargs['events'] is CONFIG_VAL
+    daq_lcls2.preconfig(**kwargs)
+    assert daq_lcls2.events_cfg.get() == events
+
+
+def test_monitor_name_case(daq_lcls2: DaqLCLS2):
+    logger.debug('test_monitor_name_case')
+    # Names are matched like the enums do, regardless of case
+    daq_lcls2._handle_status(
+        ('Configure', 'CONFIGURED', 'BEAM', False, 1, 'exp', 0, 0)
+    )
+    assert daq_lcls2.transition_sig.get() == (
+        daq_lcls2.transition_enum.configure
+    )
+    assert daq_lcls2.state_sig.get() == daq_lcls2.state_enum.configured
+    daq_lcls2._handle_progress(
+        ('progress', 'BeginRun', 1, 3) + ('error',) * 4
+    )
+    assert daq_lcls2.transition_sig.get() == (
+        daq_lcls2.transition_enum.beginrun
+    )